@@ -1,17 +1,37 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+import calendar
+import email.utils
+import gzip
+import hashlib
+import logging
 import os
 import json
 import requests
 import feedparser
+import threading
 import time
-from datetime import datetime, timedelta
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from dateutil import parser as date_parser
 from pathlib import Path
+import random
 import re
 import socket
+import sys
 import urllib3
+from urllib.parse import parse_qs, urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson 序列化比标准库快数倍，未安装时退回标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 禁用 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -31,6 +51,145 @@ HEADERS = {
 # 定义状态标签（这些将被过滤掉，包括友链申请）
 STATUS_LABELS = ['在线', '离线', '访问受限', '已通过', '待处理', '友链申请']
 
+# 日志统一走 logging：级别由 LOG_LEVEL 环境变量控制，
+# FRIENDLINKS_VERBOSE=1 等价于 LOG_LEVEL=DEBUG（保留旧开关兼容）
+VERBOSE = os.environ.get('FRIENDLINKS_VERBOSE') == '1'
+class _BufferedStreamHandler(logging.StreamHandler):
+    """不逐条 flush 的 StreamHandler
+
+    StreamHandler.emit 每条日志都会 flush，等于把 stdout 的块缓冲
+    又打回逐行刷新；这里只写不刷，落盘交给每个 Issue 处理完后的
+    统一 flush（见 process_single_issue_async 和 main 末尾）。
+    """
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+_log_handler = _BufferedStreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(
+    level='DEBUG' if VERBOSE else os.environ.get('LOG_LEVEL', 'INFO'),
+    handlers=[_log_handler]
+)
+logger = logging.getLogger('friendlinks')
+
+def debug(msg):
+    """调试日志（LOG_LEVEL=DEBUG 或 FRIENDLINKS_VERBOSE=1 时输出）"""
+    logger.debug(msg)
+
+# Issue 表单字段标题到内部键名的映射
+_FIELD_KEYS = {
+    '网站名称': 'title',
+    '网站地址': 'url',
+    '头像地址': 'avatar',
+    '网站描述': 'description',
+    'RSS 订阅地址': 'feed'
+}
+
+# 五个字段合并成一条交替正则，对 body 只需扫描一遍
+_FIELDS_PATTERN = re.compile(
+    r'### (网站名称|网站地址|头像地址|网站描述|RSS 订阅地址)\s*\n\s*([^\n]+)')
+
+# GitHub API 会话：连接复用 + 5xx 自动重试
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_github_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods={'GET', 'POST', 'PUT', 'PATCH', 'HEAD'}
+    )
+)
+SESSION.mount('https://', _github_adapter)
+SESSION.mount('http://', _github_adapter)
+
+# 访问友链站点时使用的浏览器 UA
+SITE_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# 友链站点会话：不携带 GitHub 凭据，仅复用连接
+# UA / Accept-Encoding 统一挂在会话上，各请求不再各自构造 headers
+SITE_SESSION = requests.Session()
+SITE_SESSION.headers.update({
+    'User-Agent': SITE_USER_AGENT,
+    'Accept-Encoding': 'gzip, deflate'
+})
+_site_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+SITE_SESSION.mount('https://', _site_adapter)
+SITE_SESSION.mount('http://', _site_adapter)
+
+# 批量处理时的最大并发数
+MAX_CONCURRENT_ISSUES = int(os.environ.get('MAX_CONCURRENT_ISSUES', '10'))
+
+# 批量处理的专用线程池：事件循环默认的 executor 线程数跟 CPU 数
+# 挂钩（托管 runner 上大约 8 条），会悄悄压住上面的并发上限
+ISSUE_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_ISSUES)
+
+# 保护 data['content'] 的并发修改
+DATA_LOCK = threading.Lock()
+
+# 本次运行是否有友链数据被修改，没有就不必重排序、重写盘
+DATA_DIRTY = False
+
+# 探测结果缓存：随 output 分支提交持久化，跨运行生效。
+# 定时任务是每天一次，TTL 主要照顾 Issue 事件触发的密集运行
+# （同一申请反复编辑时几分钟内会跑好几次），可按需调大覆盖更久
+CACHE_FILE = os.path.join(OUTPUT_PATH, 'v2/.cache.json')
+WEBSITE_CACHE_TTL = int(os.environ.get('WEBSITE_CACHE_TTL', '1800'))  # 网站存活状态
+RSS_CACHE_TTL = int(os.environ.get('RSS_CACHE_TTL', '900'))           # RSS 抓取结果
+
+# Issue 无变化时多久内不重新探测（秒），可按站点活跃度调大
+RECHECK_INTERVAL = int(os.environ.get('RECHECK_INTERVAL', '3600'))
+
+CACHE = {}
+CACHE_LOCK = threading.Lock()
+
+# 缓存条目的最长保留时间：缓存随 output 分支持久化后会跨运行累积，
+# 下架的友链、换过的 RSS 地址都得有机会被清出去
+_CACHE_MAX_AGE = 7 * 86400
+
+def load_cache():
+    """加载探测结果缓存"""
+    global CACHE
+    try:
+        if Path(CACHE_FILE).exists():
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                CACHE = json.load(f)
+    except Exception as e:
+        logger.info(f"缓存加载失败，忽略: {str(e)}")
+        CACHE = {}
+
+def save_cache():
+    """保存探测结果缓存（顺手清掉太久没碰过的条目）"""
+    try:
+        cutoff = time.time() - _CACHE_MAX_AGE
+        with CACHE_LOCK:
+            for section in CACHE.values():
+                for key in [k for k, v in section.items() if v.get('ts', 0) < cutoff]:
+                    del section[key]
+        Path(CACHE_FILE).parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(CACHE, f, ensure_ascii=False)
+    except Exception as e:
+        logger.info(f"缓存保存失败，忽略: {str(e)}")
+
+def cache_lookup(section, key, ttl):
+    """查缓存，命中返回 (True, 值)，过期或未命中返回 (False, None)"""
+    with CACHE_LOCK:
+        entry = CACHE.get(section, {}).get(key)
+        if entry and time.time() - entry['ts'] < ttl:
+            return True, entry['value']
+    return False, None
+
+def cache_store(section, key, value):
+    """写入缓存"""
+    with CACHE_LOCK:
+        CACHE.setdefault(section, {})[key] = {'value': value, 'ts': time.time()}
+
 def get_beijing_time():
     """获取北京时间 (UTC+8)"""
     utc_now = datetime.utcnow()
@@ -43,213 +202,517 @@ def format_beijing_time(dt=None):
         dt = get_beijing_time()
     return dt.strftime('%Y-%m-%d %H:%M:%S')
 
+# 本次运行的时间戳，整个批次共用一份，省去每条评论都 strftime
+RUN_TS = None
+
+def run_timestamp():
+    """本次运行的北京时间字符串（首次调用时生成）"""
+    global RUN_TS
+    if RUN_TS is None:
+        RUN_TS = format_beijing_time()
+    return RUN_TS
+
+# 重试退避参数与按主机熔断器：连续失败的主机在冷却期内直接跳过，
+# 不再陪着超时耗满整个重试阶梯
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 8
+_BREAKER_THRESHOLD = 5   # 连续失败多少次后熔断
+_BREAKER_COOLDOWN = 300  # 熔断持续时间（秒）
+_BREAKER = {}
+_BREAKER_LOCK = threading.Lock()
+
+def backoff_sleep(attempt):
+    """指数退避 + 抖动，避免批量重试在同一时刻齐步撞墙"""
+    time.sleep(min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5))
+
+def breaker_is_open(host):
+    """主机熔断器是否打开"""
+    if not host:
+        return False
+    with _BREAKER_LOCK:
+        state = _BREAKER.get(host)
+        return bool(state and state['fails'] >= _BREAKER_THRESHOLD
+                    and state['open_until'] > time.time())
+
+def breaker_record(host, success):
+    """记录一次对主机的探测结果，失败过多则熔断一段时间"""
+    if not host:
+        return
+    with _BREAKER_LOCK:
+        if success:
+            _BREAKER.pop(host, None)
+            return
+        state = _BREAKER.setdefault(host, {'fails': 0, 'open_until': 0})
+        state['fails'] += 1
+        if state['fails'] >= _BREAKER_THRESHOLD:
+            state['open_until'] = time.time() + _BREAKER_COOLDOWN
+
+# 进程内 DNS 缓存：同一主机在一次运行里可能被解析多次
+# （直连重试、IP 兜底、RSS 兜底），TTL 内只查一次
+_DNS_CACHE = {}
+_DNS_CACHE_TTL = 900
+_DNS_CACHE_LOCK = threading.Lock()
+
 def resolve_domain(domain):
     """尝试解析域名"""
+    with _DNS_CACHE_LOCK:
+        cached = _DNS_CACHE.get(domain)
+        if cached and time.time() - cached[1] < _DNS_CACHE_TTL:
+            debug(f"✓ 命中 DNS 缓存: {domain} -> {cached[0]}")
+            return cached[0]
+    # 原来的多 DNS 服务器循环只是建了 UDP socket 就调
+    # socket.gethostbyname，根本没用到那些服务器，纯属重复解析
     try:
-        # 尝试使用多个 DNS 服务器
-        dns_servers = ['8.8.8.8', '1.1.1.1', '114.114.114.114']
-        for dns in dns_servers:
-            try:
-                resolver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                resolver.settimeout(5)
-                # 发送 DNS 查询（简化版）
-                print(f"尝试使用 DNS {dns} 解析 {domain}")
-                ip = socket.gethostbyname(domain)
-                print(f"✓ 域名解析成功: {domain} -> {ip}")
-                return ip
-            except:
-                continue
-        return None
+        ip = socket.gethostbyname(domain)
+        debug(f"✓ 域名解析成功: {domain} -> {ip}")
+        with _DNS_CACHE_LOCK:
+            _DNS_CACHE[domain] = (ip, time.time())
+        return ip
     except Exception as e:
-        print(f"域名解析失败: {str(e)}")
+        debug(f"域名解析失败: {str(e)}")
         return None
 
-def check_website_with_retry(url, max_retries=3):
-    """带重试的网站检查"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
+def check_website_with_retry(url, max_retries=2, host=None):
+    """带重试的网站检查
+
+    host 可由调用方传入已解析好的主机名，避免重复 urlparse。
+    """
+    if host is None:
+        host = urlparse(url).hostname
+    if breaker_is_open(host):
+        debug(f"✗ 熔断器打开，跳过探测: {host}")
+        return False
     for attempt in range(max_retries):
         try:
-            print(f"尝试 {attempt + 1}/{max_retries}: {url}")
-            response = requests.get(
-                url, 
-                timeout=15, 
+            debug(f"尝试 {attempt + 1}/{max_retries}: {url}")
+            # HEAD 只读状态行，不下载整个页面
+            response = SITE_SESSION.head(
+                url,
+                timeout=(3.05, 5),
                 allow_redirects=True,
-                headers=headers,
                 verify=False
             )
-            print(f"状态码: {response.status_code}")
-            if response.status_code == 200:
+            # 部分站点不支持 HEAD，退回 GET（stream + Range 只要第一个字节，
+            # 支持 Range 的站点返回 206，不支持的也只在本地多读一点）。
+            # 403 不在此列：下面的判定已把它算作在线，不必多跑一趟
+            if response.status_code in (405, 501):
+                response = SITE_SESSION.get(
+                    url,
+                    timeout=(3.05, 10),
+                    allow_redirects=True,
+                    verify=False,
+                    stream=True,
+                    headers={'Range': 'bytes=0-0'}
+                )
+                response.close()
+            debug(f"状态码: {response.status_code}")
+            # 401/403 多半是站点对爬虫 UA 的拦截，站点本身是活着的
+            if response.status_code < 400 or response.status_code in (401, 403):
+                breaker_record(host, True)
                 return True
-            time.sleep(2)  # 等待后重试
+            backoff_sleep(attempt)
         except requests.exceptions.ConnectionError as e:
-            print(f"连接错误 (尝试 {attempt + 1}): {str(e)}")
+            debug(f"连接错误 (尝试 {attempt + 1}): {str(e)}")
             if "NameResolutionError" in str(e):
                 # 如果是域名解析错误，尝试手动解析
-                from urllib.parse import urlparse
-                parsed = urlparse(url)
-                domain = parsed.hostname
+                domain = host
                 ip = resolve_domain(domain)
                 if ip:
                     # 使用 IP 地址重试
                     new_url = url.replace(domain, ip)
-                    headers['Host'] = domain  # 添加 Host 头
                     try:
-                        print(f"使用 IP 地址重试: {new_url}")
-                        response = requests.get(
+                        debug(f"使用 IP 地址重试: {new_url}")
+                        response = SITE_SESSION.head(
                             new_url,
-                            timeout=15,
+                            timeout=(3.05, 5),
                             allow_redirects=True,
-                            headers=headers,
+                            headers={'Host': domain},
                             verify=False
                         )
-                        if response.status_code == 200:
+                        if response.status_code < 400 or response.status_code in (401, 403):
+                            breaker_record(host, True)
                             return True
                     except Exception as ip_e:
-                        print(f"IP 重试失败: {str(ip_e)}")
-            time.sleep(2)
+                        debug(f"IP 重试失败: {str(ip_e)}")
+            backoff_sleep(attempt)
         except Exception as e:
-            print(f"其他错误 (尝试 {attempt + 1}): {str(e)}")
-            time.sleep(2)
-    
+            debug(f"其他错误 (尝试 {attempt + 1}): {str(e)}")
+            backoff_sleep(attempt)
+
+    breaker_record(host, False)
     return False
 
 def check_website_robust(url):
     """健壮的网站检查"""
-    print(f"\n开始健壮性检查: {url}")
-    
-    # 方法1: 带重试的直接请求
-    if check_website_with_retry(url):
-        print("✓ 方法1: 带重试的直接请求成功")
-        return True
-    
-    # 方法2: 检查基本连接性
-    print("方法1失败，尝试基本连接性检查...")
-    try:
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        hostname = parsed.hostname
+    debug(f"\n开始健壮性检查: {url}")
+
+    # 缓存命中时直接复用最近的探测结果
+    hit, cached = cache_lookup('website', url, WEBSITE_CACHE_TTL)
+    if hit:
+        debug(f"✓ 命中网站状态缓存: {'在线' if cached else '离线'}")
+        return cached
+
+    result = _check_website_robust_uncached(url)
+    cache_store('website', url, result)
+    return result
+
+def _check_website_robust_uncached(url):
+    """实际执行网站探测（不走缓存）
+
+    先做 2 秒 TCP 预检：端口都不通的死站直接判离线，不用陪完
+    整个 HTTP 重试阶梯。注意 TCP 通了不代表在线（停放域名也能
+    建连），在线与否仍由 check_website_with_retry 的 HTTP 探测决定。
+    """
+    parsed = urlparse(url)
+    host = parsed.hostname
+    if host:
         port = parsed.port or (443 if parsed.scheme == 'https' else 80)
-        
-        # 先解析域名
-        ip = resolve_domain(hostname)
-        if not ip:
-            print("✗ 无法解析域名")
-            return False
-            
-        # 尝试 TCP 连接
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(10)
-        result = sock.connect_ex((ip, port))
-        sock.close()
-        
-        if result == 0:
-            print("✓ TCP 连接成功")
-            return True
-        else:
-            print(f"✗ TCP 连接失败 (错误码: {result})")
-            return False
-    except Exception as e:
-        print(f"基本连接性检查失败: {str(e)}")
-        return False
+        ip = resolve_domain(host)
+        if ip:
+            try:
+                socket.create_connection((ip, port), timeout=2).close()
+            except OSError as e:
+                debug(f"✗ TCP 预检失败: {host}:{port} ({str(e)})")
+                breaker_record(host, False)
+                return False
+    if check_website_with_retry(url, host=host):
+        debug("✓ 网站探测成功")
+        return True
+    return False
+
+def _parse_feed_cached(feed_url, body, max_posts):
+    """正文哈希没变时直接复用上次的解析结果
+
+    不带 ETag 的站点每次都返回完整正文，但内容往往并没有变；
+    feedparser 解析是纯 Python、整个 RSS 路径里最贵的 CPU 开销，
+    比对一次 blake2b 哈希就能把它省掉。
+    """
+    h = hashlib.blake2b(body, digest_size=16).hexdigest()
+    _, cached = cache_lookup('rss_hash', feed_url, _CACHE_MAX_AGE)
+    if cached and cached.get('hash') == h:
+        debug("✓ RSS 正文哈希未变，跳过解析")
+        cache_store('rss_hash', feed_url, cached)  # 刷新时间戳，活跃订阅不被清理
+        return cached['posts']
+    posts = parse_feed_content(body, max_posts)
+    cache_store('rss_hash', feed_url, {'hash': h, 'posts': posts})
+    return posts
+
+def fetch_rss_with_fallback(feed_url, max_posts=3, etag=None, last_modified=None):
+    """带备用方案的 RSS 抓取
+
+    支持 ETag / Last-Modified 条件请求：服务器返回 304 时说明内容
+    没有变化，返回 (None, etag, last_modified)，由调用方沿用上次结果。
+    正常抓取时返回 (posts, 新etag, 新last_modified)。
+    """
+    # 缓存命中时跳过网络抓取
+    hit, cached = cache_lookup('rss', feed_url, RSS_CACHE_TTL)
+    if hit:
+        debug(f"✓ 命中 RSS 缓存: {feed_url}")
+        return cached[0], cached[1], cached[2]
+
+    host = urlparse(feed_url).hostname
+    if breaker_is_open(host):
+        debug(f"✗ 熔断器打开，跳过 RSS 抓取: {host}")
+        return [], None, None
+
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
 
-def fetch_rss_with_fallback(feed_url, max_posts=3):
-    """带备用方案的 RSS 抓取"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     # 方法1: 直接抓取
     try:
-        print(f"方法1: 直接抓取 RSS")
-        response = requests.get(feed_url, headers=headers, timeout=15, verify=False)
+        debug(f"方法1: 直接抓取 RSS")
+        response = SITE_SESSION.get(feed_url, headers=headers, timeout=(3.05, 15), verify=False)
+        if response.status_code == 304:
+            debug("✓ RSS 未变化 (304)")
+            breaker_record(host, True)
+            return None, etag, last_modified
         response.raise_for_status()
-        feed = feedparser.parse(response.content)
-        return process_feed_entries(feed, max_posts)
+        posts = _parse_feed_cached(feed_url, response.content, max_posts)
+        new_etag = response.headers.get('ETag')
+        new_modified = response.headers.get('Last-Modified')
+        cache_store('rss', feed_url, [posts, new_etag, new_modified])
+        breaker_record(host, True)
+        return posts, new_etag, new_modified
     except Exception as e:
-        print(f"直接抓取失败: {str(e)}")
-    
+        debug(f"直接抓取失败: {str(e)}")
+
     # 方法2: 尝试使用 IP 地址
     try:
-        from urllib.parse import urlparse
-        parsed = urlparse(feed_url)
-        domain = parsed.hostname
+        domain = host
         ip = resolve_domain(domain)
-        
+
         if ip:
-            print(f"方法2: 使用 IP 地址抓取")
+            debug(f"方法2: 使用 IP 地址抓取")
             new_feed_url = feed_url.replace(domain, ip)
             headers['Host'] = domain
-            response = requests.get(new_feed_url, headers=headers, timeout=15, verify=False)
+            response = SITE_SESSION.get(new_feed_url, headers=headers, timeout=(3.05, 15), verify=False)
+            if response.status_code == 304:
+                debug("✓ RSS 未变化 (304)")
+                breaker_record(host, True)
+                return None, etag, last_modified
             response.raise_for_status()
-            feed = feedparser.parse(response.content)
-            return process_feed_entries(feed, max_posts)
+            posts = _parse_feed_cached(feed_url, response.content, max_posts)
+            new_etag = response.headers.get('ETag')
+            new_modified = response.headers.get('Last-Modified')
+            cache_store('rss', feed_url, [posts, new_etag, new_modified])
+            breaker_record(host, True)
+            return posts, new_etag, new_modified
     except Exception as e:
-        print(f"IP 地址抓取失败: {str(e)}")
-    
+        debug(f"IP 地址抓取失败: {str(e)}")
+
     # 方法3: 尝试公共 RSS 代理服务（如果有）
-    print("方法3: 所有方法都失败")
-    return []
+    logger.info("方法3: 所有方法都失败")
+    breaker_record(host, False)
+    return [], None, None
+
+def parse_pub_time(published):
+    """解析条目发布时间：先走标准库快速路径，再退回 dateutil
+
+    RSS 的 pubDate 是 RFC 822，Atom 的 published/updated 是 RFC 3339，
+    标准库都有专用解析器，比通用的 dateutil 快一个数量级。
+    """
+    try:
+        dt = email.utils.parsedate_to_datetime(published)
+        if dt is not None:
+            return dt
+    except Exception:
+        pass
+    try:
+        return datetime.fromisoformat(published.replace('Z', '+00:00'))
+    except Exception:
+        pass
+    return date_parser.parse(published)
+
+def format_entry_time(published):
+    """把条目的发布时间转成北京时间字符串，解析失败时原样返回"""
+    if not published:
+        return ""
+    try:
+        dt = parse_pub_time(published)
+        # 带时区的时间先归一到 UTC 再转北京时间，否则 +0800 的
+        # pubDate 会被多加 8 小时，和 published_parsed 路径对不上
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        dt_beijing = dt + timedelta(hours=8)
+        return dt_beijing.strftime('%Y-%m-%d %H:%M')
+    except:
+        return published
+
+def stream_parse_entries(content, max_posts):
+    """用 iterparse 流式提取前 max_posts 条文章，失败返回 None
+
+    feedparser 会完整解析整个文档，而我们只需要最前面几条；
+    增量解析拿够条目就停止，大订阅源可以省掉绝大部分解析开销。
+    """
+    import io
+    from xml.etree import ElementTree
+
+    posts = []
+    try:
+        for event, el in ElementTree.iterparse(io.BytesIO(content), events=('end',)):
+            tag = el.tag.split('}')[-1]
+            if tag not in ('item', 'entry'):
+                continue
+
+            fields = {}
+            link = ''
+            for child in el:
+                ctag = child.tag.split('}')[-1]
+                if ctag == 'link':
+                    # RSS 的 link 是文本，Atom 的 link 是 href 属性
+                    link = link or (child.text or '').strip() or child.get('href', '')
+                else:
+                    fields[ctag] = (child.text or '').strip()
+
+            published = (fields.get('pubDate')
+                         or fields.get('published')
+                         or fields.get('updated'))
+            posts.append({
+                'title': fields.get('title', ''),
+                'link': link,
+                'published': format_entry_time(published)
+            })
+            el.clear()
+            if len(posts) >= max_posts:
+                break
+    except ElementTree.ParseError as e:
+        debug(f"流式解析失败，退回 feedparser: {str(e)}")
+        return None
+
+    if posts:
+        debug(f"✓ 流式解析提取 {len(posts)} 篇文章")
+        return posts
+    return None
 
 def process_feed_entries(feed, max_posts):
     """处理 Feed 条目"""
     posts = []
     for entry in feed.entries[:max_posts]:
-        published = None
-        if hasattr(entry, 'published'):
-            published = entry.published
-        elif hasattr(entry, 'updated'):
-            published = entry.updated
-
-        # 解析发布时间
-        published_time = ""
-        if published:
-            try:
-                dt = date_parser.parse(published)
-                # 转换为北京时间
-                dt_beijing = dt + timedelta(hours=8)
-                published_time = dt_beijing.strftime('%Y-%m-%d %H:%M')
-            except:
-                published_time = published
+        # feedparser 已经把时间解析成 struct_time（published_parsed），
+        # 直接换算即可，省掉对原始字符串再跑一遍日期解析
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        if parsed:
+            dt_beijing = datetime.utcfromtimestamp(
+                calendar.timegm(parsed)) + timedelta(hours=8)
+            published = dt_beijing.strftime('%Y-%m-%d %H:%M')
+        else:
+            published = format_entry_time(
+                entry.get('published') or entry.get('updated'))
 
         posts.append({
-            'title': entry.title if hasattr(entry, 'title') else '',
-            'link': entry.link if hasattr(entry, 'link') else '',
-            'published': published_time
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'published': published
         })
 
-    print(f"成功处理 {len(posts)} 篇文章")
+    debug(f"成功处理 {len(posts)} 篇文章")
     return posts
 
+def parse_feed_content(content, max_posts):
+    """解析订阅源内容：优先流式解析，失败退回 feedparser"""
+    posts = stream_parse_entries(content, max_posts)
+    if posts is not None:
+        return posts
+    feed = feedparser.parse(content)
+    return process_feed_entries(feed, max_posts)
+
 def parse_issue_body(body):
     """解析 Issue 内容"""
-    print(f"\n=== 开始解析 Issue 内容 ===")
+    debug(f"\n=== 开始解析 Issue 内容 ===")
     data = {}
 
-    patterns = {
-        'title': r'### 网站名称\s*\n\s*([^\n]+)',
-        'url': r'### 网站地址\s*\n\s*([^\n]+)',
-        'avatar': r'### 头像地址\s*\n\s*([^\n]+)',
-        'description': r'### 网站描述\s*\n\s*([^\n]+)',
-        'feed': r'### RSS 订阅地址\s*\n\s*([^\n]+)'
-    }
+    for match in _FIELDS_PATTERN.finditer(body):
+        key = _FIELD_KEYS[match.group(1)]
+        if key not in data:
+            data[key] = match.group(2).strip()
 
-    for key, pattern in patterns.items():
-        match = re.search(pattern, body, re.MULTILINE)
-        if match:
-            value = match.group(1).strip()
-            data[key] = value
-            print(f"✓ 成功解析 {key}: {value}")
+    for key in _FIELD_KEYS.values():
+        if key in data:
+            debug(f"✓ 成功解析 {key}: {data[key]}")
         else:
-            print(f"✗ 未找到 {key}")
+            debug(f"✗ 未找到 {key}")
 
-    print("=== Issue 解析完成 ===\n")
+    debug("=== Issue 解析完成 ===\n")
     return data
 
+GRAPHQL_URL = 'https://api.github.com/graphql'
+
+def github_request(method, url, **kwargs):
+    """GitHub API 请求包装：按速率限制响应头自适应等待
+
+    额度充足时不做任何等待；收到 403/429 且带 Retry-After 时按服务器
+    要求的时长等待后重试一次；剩余额度过低时睡到重置时间，避免后续
+    请求直接失败。
+
+    默认超时按 (连接, 读取) 分开设置：GitHub API 响应很快，没必要
+    跟友链站点共用一个宽松超时，偶发的网络卡死也能尽早暴露。
+    """
+    kwargs.setdefault('timeout', (3.05, 10))
+    response = SESSION.request(method, url, **kwargs)
+
+    if response.status_code in (403, 429) and 'Retry-After' in response.headers:
+        wait = int(response.headers['Retry-After'])
+        logger.info(f"触发速率限制，等待 {wait} 秒后重试")
+        time.sleep(wait)
+        response = SESSION.request(method, url, **kwargs)
+
+    remaining = int(response.headers.get('X-RateLimit-Remaining', '5000'))
+    if remaining < 50:
+        reset = int(response.headers.get('X-RateLimit-Reset', '0'))
+        wait = max(0, reset - int(time.time()))
+        if wait:
+            logger.info(f"API 剩余额度不足 ({remaining})，等待 {wait} 秒至重置")
+            time.sleep(wait)
+
+    return response
+
+def get_all_issues_graphql():
+    """通过 GraphQL 批量获取友链申请 Issue，失败返回 None
+
+    REST 版本每 100 个 Issue 就要一次请求，GraphQL 一次查询即可带回
+    number/title/body/labels 全部字段，节省 API 配额。评论也一并带回，
+    用来预填机器人评论 id 缓存，处理阶段就不用再逐个拉评论列表。
+    """
+    query = '''
+    query($q: String!, $cursor: String) {
+      search(query: $q, type: ISSUE, first: 100, after: $cursor) {
+        nodes {
+          ... on Issue {
+            id
+            number
+            title
+            body
+            updatedAt
+            labels(first: 20) { nodes { name color } }
+            comments(first: 30) { nodes { databaseId id author { login } } }
+          }
+        }
+        pageInfo { hasNextPage endCursor }
+      }
+    }
+    '''
+    q = f'repo:{REPO} is:issue is:open label:"友链申请"'
+    issues = []
+    cursor = None
+
+    try:
+        while True:
+            response = github_request(
+                'POST', GRAPHQL_URL,
+                json={'query': query, 'variables': {'q': q, 'cursor': cursor}}
+            )
+            response.raise_for_status()
+            payload = response.json()
+            if payload.get('errors'):
+                raise RuntimeError(str(payload['errors']))
+
+            search = payload['data']['search']
+            for node in search['nodes']:
+                if not node:
+                    continue
+                # 转换成 REST 风格的字段，下游处理逻辑保持不变
+                issues.append({
+                    'node_id': node['id'],
+                    'number': node['number'],
+                    'title': node['title'],
+                    'body': node['body'],
+                    'updated_at': node.get('updatedAt', ''),
+                    'labels': [
+                        {'name': l['name'], 'color': l.get('color', '')}
+                        for l in node['labels']['nodes']
+                    ]
+                })
+
+                # 预填机器人评论 id 缓存（GraphQL 里机器人 login 不带 [bot] 后缀）
+                bot_ids = (None, None)
+                for comment in node.get('comments', {}).get('nodes', []):
+                    login = (comment.get('author') or {}).get('login')
+                    if login in ('github-actions', 'github-actions[bot]'):
+                        bot_ids = (comment.get('databaseId'), comment.get('id'))
+                        break
+                with _BOT_COMMENTS_LOCK:
+                    _BOT_COMMENTS[node['number']] = bot_ids
+
+            if not search['pageInfo']['hasNextPage']:
+                break
+            cursor = search['pageInfo']['endCursor']
+
+        logger.info(f"✓ GraphQL 批量获取 {len(issues)} 个友链申请")
+        return issues
+    except Exception as e:
+        logger.info(f"GraphQL 获取 Issues 失败，退回 REST: {str(e)}")
+        return None
+
 def get_all_issues():
     """获取所有友链申请的 Issue"""
+    issues = get_all_issues_graphql()
+    if issues is not None:
+        return issues
+
+    # GraphQL 不可用时退回 REST 分页接口
     url = f'https://api.github.com/repos/{REPO}/issues'
     params = {
         'labels': '友链申请',
@@ -258,11 +721,27 @@ def get_all_issues():
     }
 
     try:
-        response = requests.get(url, headers=HEADERS, params=params)
+        response = github_request('GET', url, params=params)
         response.raise_for_status()
-        return response.json()
+        issues = response.json()
+
+        # 超过一页时按 Link 头取末页页码，剩余页并发抓取
+        last_link = response.links.get('last', {}).get('url', '')
+        if last_link:
+            last_page = int(parse_qs(urlparse(last_link).query)['page'][0])
+
+            def fetch_page(page):
+                page_response = github_request('GET', url, params={**params, 'page': page})
+                page_response.raise_for_status()
+                return page_response.json()
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for page_issues in executor.map(fetch_page, range(2, last_page + 1)):
+                    issues.extend(page_issues)
+
+        return issues
     except Exception as e:
-        print(f"获取 Issues 失败: {str(e)}")
+        logger.info(f"获取 Issues 失败: {str(e)}")
         return []
 
 def get_issue_comments(issue_number):
@@ -270,25 +749,144 @@ def get_issue_comments(issue_number):
     url = f'https://api.github.com/repos/{REPO}/issues/{issue_number}/comments'
     
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = github_request('GET', url)
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"获取评论失败: {str(e)}")
+        logger.info(f"获取评论失败: {str(e)}")
         return []
 
-def get_bot_comment_id(issue_number):
-    """获取机器人评论的 ID"""
+# 机器人评论 id 缓存：同一 Issue 的处理流程里经常要更新两次评论
+# （先报进度再报结果），评论列表只拉一次
+_BOT_COMMENTS = {}
+_BOT_COMMENTS_LOCK = threading.Lock()
+
+def _bot_comment_ids(issue_number):
+    """返回机器人评论的 (REST id, GraphQL node id)，按 Issue 缓存"""
+    with _BOT_COMMENTS_LOCK:
+        if issue_number in _BOT_COMMENTS:
+            return _BOT_COMMENTS[issue_number]
+
     comments = get_issue_comments(issue_number)
-    
     # GitHub Actions 中的机器人用户名是 'github-actions[bot]'
     bot_username = 'github-actions[bot]'
-    
+    ids = (None, None)
     for comment in comments:
         if comment.get('user', {}).get('login') == bot_username:
-            return comment['id']
-    
-    return None
+            ids = (comment['id'], comment.get('node_id'))
+            break
+
+    with _BOT_COMMENTS_LOCK:
+        _BOT_COMMENTS[issue_number] = ids
+    return ids
+
+def get_bot_comment_id(issue_number):
+    """获取机器人评论的 ID"""
+    return _bot_comment_ids(issue_number)[0]
+
+def get_bot_comment_node_id(issue_number):
+    """获取机器人评论的 GraphQL node id"""
+    return _bot_comment_ids(issue_number)[1]
+
+# 仓库标签的 GraphQL node id 缓存，首次使用时批量拉取
+_LABEL_IDS = None
+_LABEL_IDS_LOCK = threading.Lock()
+
+def get_label_id(label_name):
+    """查标签的 GraphQL node id，未知标签返回 None"""
+    global _LABEL_IDS
+    with _LABEL_IDS_LOCK:
+        if _LABEL_IDS is None:
+            _LABEL_IDS = fetch_label_ids()
+    return _LABEL_IDS.get(label_name)
+
+def fetch_label_ids():
+    """批量获取仓库所有标签的 GraphQL node id"""
+    query = '''
+    query($owner: String!, $name: String!) {
+      repository(owner: $owner, name: $name) {
+        labels(first: 100) { nodes { id name } }
+      }
+    }
+    '''
+    try:
+        owner, name = REPO.split('/')
+        response = github_request(
+            'POST', GRAPHQL_URL,
+            json={'query': query, 'variables': {'owner': owner, 'name': name}}
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get('errors'):
+            raise RuntimeError(str(payload['errors']))
+        nodes = payload['data']['repository']['labels']['nodes']
+        return {node['name']: node['id'] for node in nodes}
+    except Exception as e:
+        logger.info(f"获取标签列表失败: {str(e)}")
+        return {}
+
+def notify_issue(issue, comment_body, labels_to_add):
+    """评论 + 标签合并为一次 GraphQL 请求
+
+    REST 流程对每个 Issue 要两次写请求（评论、标签），合并后只占用
+    一次写配额、一次网络往返。缺少 node id 或 GraphQL 失败时退回
+    原有的 REST 流程。
+    """
+    issue_number = issue['number']
+    issue_node_id = issue.get('node_id')
+    label_ids = [get_label_id(name) for name in labels_to_add]
+
+    current_labels = [label['name'] for label in issue.get('labels', [])]
+
+    if not issue_node_id or not label_ids or None in label_ids:
+        # 信息不全时退回 REST 双请求
+        update_comment_on_issue(issue_number, comment_body)
+        if labels_to_add:
+            add_labels_to_issue(issue_number, labels_to_add, current_labels)
+        return
+
+    comment_node_id = get_bot_comment_node_id(issue_number)
+    if comment_node_id:
+        mutation = '''
+        mutation($id: ID!, $commentId: ID!, $body: String!, $labelIds: [ID!]!) {
+          c: updateIssueComment(input: {id: $commentId, body: $body}) { clientMutationId }
+          l: addLabelsToLabelable(input: {labelableId: $id, labelIds: $labelIds}) { clientMutationId }
+        }
+        '''
+        variables = {
+            'id': issue_node_id,
+            'commentId': comment_node_id,
+            'body': comment_body,
+            'labelIds': label_ids
+        }
+    else:
+        mutation = '''
+        mutation($id: ID!, $body: String!, $labelIds: [ID!]!) {
+          c: addComment(input: {subjectId: $id, body: $body}) { clientMutationId }
+          l: addLabelsToLabelable(input: {labelableId: $id, labelIds: $labelIds}) { clientMutationId }
+        }
+        '''
+        variables = {
+            'id': issue_node_id,
+            'body': comment_body,
+            'labelIds': label_ids
+        }
+
+    try:
+        response = github_request(
+            'POST', GRAPHQL_URL,
+            json={'query': mutation, 'variables': variables}
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get('errors'):
+            raise RuntimeError(str(payload['errors']))
+        logger.info(f"✓ 评论与标签已更新 (GraphQL): {labels_to_add}")
+    except Exception as e:
+        logger.info(f"GraphQL 更新失败，退回 REST: {str(e)}")
+        update_comment_on_issue(issue_number, comment_body)
+        if labels_to_add:
+            add_labels_to_issue(issue_number, labels_to_add, current_labels)
 
 def update_comment_on_issue(issue_number, comment_body):
     """更新或创建评论"""
@@ -300,12 +898,12 @@ def update_comment_on_issue(issue_number, comment_body):
         data = {'body': comment_body}
         
         try:
-            response = requests.patch(url, headers=HEADERS, json=data)
+            response = github_request('PATCH', url, json=data)
             response.raise_for_status()
-            print(f"✓ 更新评论: {comment_id}")
+            logger.info(f"✓ 更新评论: {comment_id}")
             return True
         except Exception as e:
-            print(f"更新评论失败: {str(e)}")
+            logger.info(f"更新评论失败: {str(e)}")
             return False
     else:
         # 创建新评论
@@ -313,23 +911,33 @@ def update_comment_on_issue(issue_number, comment_body):
         data = {'body': comment_body}
         
         try:
-            response = requests.post(url, headers=HEADERS, json=data)
+            response = github_request('POST', url, json=data)
             response.raise_for_status()
-            print(f"✓ 创建新评论")
+            created = response.json()
+            # 记住新评论的 id，同一 Issue 的下一次更新直接走 PATCH
+            with _BOT_COMMENTS_LOCK:
+                _BOT_COMMENTS[issue_number] = (created.get('id'), created.get('node_id'))
+            logger.info(f"✓ 创建新评论")
             return True
         except Exception as e:
-            print(f"创建评论失败: {str(e)}")
+            logger.info(f"创建评论失败: {str(e)}")
             return False
 
-def add_labels_to_issue(issue_number, labels_to_add):
-    """添加标签到 Issue，不删除原有标签"""
-    # 获取当前标签
-    current_issue = get_issue(issue_number)
-    if not current_issue:
-        return False
-        
-    current_labels = [label['name'] for label in current_issue.get('labels', [])]
-    
+def add_labels_to_issue(issue_number, labels_to_add, current_labels=None):
+    """添加标签到 Issue，不删除原有标签
+
+    调用方手里已有 Issue 数据时可传 current_labels（标签名列表），
+    省掉一次 get_issue 查询。
+    """
+    if current_labels is None:
+        # 获取当前标签
+        current_issue = get_issue(issue_number)
+        if not current_issue:
+            return False
+        current_labels = [label['name'] for label in current_issue.get('labels', [])]
+    else:
+        current_labels = list(current_labels)
+
     # 添加新标签（如果不存在）
     for label in labels_to_add:
         if label not in current_labels:
@@ -340,12 +948,12 @@ def add_labels_to_issue(issue_number, labels_to_add):
     data = {'labels': current_labels}
 
     try:
-        response = requests.put(url, headers=HEADERS, json=data)
+        response = github_request('PUT', url, json=data)
         response.raise_for_status()
-        print(f"✓ 更新标签: {current_labels}")
+        logger.info(f"✓ 更新标签: {current_labels}")
         return True
     except Exception as e:
-        print(f"更新标签失败: {str(e)}")
+        logger.info(f"更新标签失败: {str(e)}")
         return False
 
 def get_issue(issue_number):
@@ -353,11 +961,11 @@ def get_issue(issue_number):
     url = f'https://api.github.com/repos/{REPO}/issues/{issue_number}'
     
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = github_request('GET', url)
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"获取 Issue 失败: {str(e)}")
+        logger.info(f"获取 Issue 失败: {str(e)}")
         return None
 
 def hex_to_hsl(hex_color):
@@ -436,96 +1044,172 @@ def load_data():
     Path(DATA_FILE).parent.mkdir(parents=True, exist_ok=True)
 
     if Path(DATA_FILE).exists():
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        raw = Path(DATA_FILE).read_bytes()
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
     else:
         return {'version': 'v2', 'content': []}
 
+# published 字段的标准格式；符合该格式的字符串按字典序即按时间序
+_PUBLISHED_FORMAT = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}')
+
+def _content_sort_key(item):
+    """按最新文章发布时间排序的键，没有文章或格式异常的排最后
+
+    '%Y-%m-%d %H:%M' 格式字典序与时间序一致，直接比较字符串即可，
+    省掉每个条目一次 strptime。
+    """
+    posts = item.get('posts')
+    if not posts:
+        return ''
+    published = posts[0].get('published', '')
+    if _PUBLISHED_FORMAT.fullmatch(published):
+        return published
+    return ''
+
+def _write_data_gzip(payload):
+    """原子写入 data.json.gz，与主文件相同的 tmp + replace 套路"""
+    gz_tmp = DATA_FILE + '.gz.tmp'
+    with gzip.open(gz_tmp, 'wb', compresslevel=6) as f:
+        f.write(payload)
+    os.replace(gz_tmp, DATA_FILE + '.gz')
+
 def save_data(data):
-    """保存数据"""
-    for item in data['content']:
-        if item['posts']:
+    """保存数据（本次运行没有修改时直接跳过）"""
+    if not DATA_DIRTY:
+        logger.info("✓ 数据无变化，跳过排序与写盘")
+        # .gz 缺失时（比如首次启用 gzip 产物）用盘上的 data.json 补一份，
+        # 否则工作流 git add 不到 data.json.gz 会直接报错
+        if not os.path.exists(DATA_FILE + '.gz'):
             try:
-                latest_time = datetime.strptime(item['posts'][0]['published'], '%Y-%m-%d %H:%M')
-                item['_sort_time'] = latest_time.timestamp()
-            except:
-                item['_sort_time'] = 0
-        else:
-            item['_sort_time'] = 0
+                with open(DATA_FILE, 'rb') as f:
+                    _write_data_gzip(f.read())
+            except OSError:
+                pass  # data.json 也还不存在，没东西可补
+        return
 
-    data['content'].sort(key=lambda x: x.get('_sort_time', 0), reverse=True)
+    data['content'].sort(key=_content_sort_key, reverse=True)
 
-    for item in data['content']:
-        if '_sort_time' in item:
-            del item['_sort_time']
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
 
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 序列化结果跟盘上一致时不重写，避免空产出的 cron 运行搅出 git diff
+    try:
+        with open(DATA_FILE, 'rb') as f:
+            old_digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+        if hashlib.blake2b(payload, digest_size=16).digest() == old_digest:
+            logger.info("✓ 序列化结果与盘上一致，跳过写盘")
+            # .gz 缺失时（比如首次启用 gzip 产物）仍要补上
+            if not os.path.exists(DATA_FILE + '.gz'):
+                _write_data_gzip(payload)
+            return
+    except OSError:
+        pass  # 文件不存在等，正常走写入
 
-def process_single_issue(issue, data):
-    """处理单个 Issue - 放宽检查条件"""
+    # 先写临时文件再原子替换，进程被杀也不会留下残缺的 data.json
+    tmp_file = DATA_FILE + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_file, DATA_FILE)
+
+    # 同步生成 gzip 版本，文本内容压缩率很高，下游拉取省带宽
+    _write_data_gzip(payload)
+
+# 评论模板提前拼好，热循环里只做一次 % 格式化
+_COMMENT_MISSING = "❌ 友链信息不完整\n\n缺少以下必需字段: %s\n\n请检查 Issue 内容格式是否正确。\n\n检查时间: %s"
+_COMMENT_SITE_FAIL = "⚠️ 网站访问检查失败\n\n在 GitHub Actions 环境中无法访问 %s，这可能是由于网络限制。\n\n我们会继续处理 RSS 订阅源，如果 RSS 可用，友链仍会被添加。\n\n检查时间: %s"
+_COMMENT_RSS_FAIL = "❌ RSS 订阅源访问失败\n\n无法获取 %s 的内容，请检查 RSS 地址是否正确且可公开访问。\n\n检查时间: %s"
+_COMMENT_UPDATED = "✅ 友链已更新\n\n- 网站名称: %s\n- 网站状态: %s\n- 最新文章数: %d\n- 自定义标签: %s\n\n更新时间: %s"
+_COMMENT_APPROVED = "✅ 友链申请已通过\n\n欢迎加入友链！\n\n- 网站名称: %s\n- 网站状态: %s\n- 最新文章数: %d\n- 自定义标签: %s\n\n审核时间: %s"
+
+def process_single_issue(issue, data, index):
+    """处理单个 Issue - 放宽检查条件
+
+    index 是 issue_number -> data['content'] 下标的映射，
+    避免每个 Issue 都线性扫描整个友链列表。
+    """
     issue_number = issue['number']
     body = issue['body'] or ''
 
-    print(f"\n{'='*60}")
-    print(f"开始处理 Issue #{issue_number}")
-    print(f"Issue 标题: {issue.get('title', 'N/A')}")
-    print(f"Issue 标签: {[label['name'] for label in issue.get('labels', [])]}")
-    print(f"{'='*60}")
+    logger.info(f"\n{'='*60}")
+    logger.info(f"开始处理 Issue #{issue_number}")
+    logger.info(f"Issue 标题: {issue.get('title', 'N/A')}")
+    logger.info(f"Issue 标签: {[label['name'] for label in issue.get('labels', [])]}")
+    logger.info(f"{'='*60}")
 
     # 解析 Issue 内容
     info = parse_issue_body(body)
 
     if not all(k in info for k in ['title', 'url', 'feed']):
         missing = [k for k in ['title', 'url', 'feed'] if k not in info]
-        print(f"❌ Issue #{issue_number} 信息不完整，缺少字段: {missing}")
+        logger.info(f"❌ Issue #{issue_number} 信息不完整，缺少字段: {missing}")
         update_comment_on_issue(
             issue_number,
-            f"❌ 友链信息不完整\n\n缺少以下必需字段: {', '.join(missing)}\n\n请检查 Issue 内容格式是否正确。\n\n检查时间: {format_beijing_time()}"
+            _COMMENT_MISSING % (', '.join(missing), run_timestamp())
         )
         return False
 
-    print(f"\n✓ Issue 信息解析成功")
+    logger.info(f"\n✓ Issue 信息解析成功")
+
+    # 查找已有条目，取出上次的 ETag / Last-Modified 做条件请求
+    with DATA_LOCK:
+        existing_index = index.get(issue_number)
+        existing = data['content'][existing_index] if existing_index is not None else None
+
+    # Issue 未更新且上次检查不足 1 小时时，直接沿用现有数据
+    if (existing is not None
+            and issue.get('updated_at')
+            and existing.get('issue_updated_at') == issue.get('updated_at')
+            and time.time() - existing.get('checked_ts', 0) < RECHECK_INTERVAL):
+        logger.info(f"✓ Issue #{issue_number} 无变化且检查未过期，跳过探测")
+        return True
+
+    # 网站检查和 RSS 抓取相互独立，并行执行
+    logger.info(f"\n正在检查网站: {info['url']}")
+    logger.info(f"正在抓取 RSS: {info['feed']}")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future_site = executor.submit(check_website_robust, info['url'])
+        future_rss = executor.submit(
+            fetch_rss_with_fallback,
+            info['feed'],
+            etag=existing.get('etag') if existing else None,
+            last_modified=existing.get('last_modified') if existing else None
+        )
+        website_online = future_site.result()
+        posts, feed_etag, feed_last_modified = future_rss.result()
 
-    # 放宽网站检查条件
-    print(f"\n正在检查网站: {info['url']}")
-    website_online = check_website_robust(info['url'])
-    
     # 确定状态标签
     status_label = '在线' if website_online else '访问受限'
     
     # 即使网站检查失败也继续处理，因为可能是 GitHub Actions 的网络限制
     if not website_online:
-        print(f"⚠️ 网站检查失败，继续处理 RSS: {info['url']}")
+        logger.info(f"⚠️ 网站检查失败，继续处理 RSS: {info['url']}")
         update_comment_on_issue(
             issue_number,
-            f"⚠️ 网站访问检查失败\n\n在 GitHub Actions 环境中无法访问 {info['url']}，这可能是由于网络限制。\n\n我们会继续处理 RSS 订阅源，如果 RSS 可用，友链仍会被添加。\n\n检查时间: {format_beijing_time()}"
+            _COMMENT_SITE_FAIL % (info['url'], run_timestamp())
         )
     else:
-        print(f"✓ 网站在线")
+        logger.info(f"✓ 网站在线")
 
-    # 抓取 RSS - 使用备用方案
-    print(f"\n正在抓取 RSS: {info['feed']}")
-    posts = fetch_rss_with_fallback(info['feed'])
+    if posts is None:
+        # 304 未变化，沿用上次的文章列表
+        posts = existing['posts'] if existing else []
+        logger.info(f"✓ RSS 未变化，沿用上次的 {len(posts)} 篇文章")
 
     if not posts:
-        print(f"❌ RSS 抓取失败: {info['feed']}")
-        update_comment_on_issue(
-            issue_number,
-            f"❌ RSS 订阅源访问失败\n\n无法获取 {info['feed']} 的内容，请检查 RSS 地址是否正确且可公开访问。\n\n检查时间: {format_beijing_time()}"
+        logger.info(f"❌ RSS 抓取失败: {info['feed']}")
+        # RSS 失败时也添加状态标签（评论 + 标签合并为一次请求）
+        notify_issue(
+            issue,
+            _COMMENT_RSS_FAIL % (info['feed'], run_timestamp()),
+            [status_label]
         )
-        # RSS 失败时也添加状态标签
-        add_labels_to_issue(issue_number, [status_label])
         return False
 
-    print(f"✓ RSS 抓取成功，获取 {len(posts)} 篇文章")
-
-    # 查找是否已存在
-    existing_index = None
-    for i, item in enumerate(data['content']):
-        if item['issue_number'] == issue_number:
-            existing_index = i
-            break
+    logger.info(f"✓ RSS 抓取成功，获取 {len(posts)} 篇文章")
 
     # 过滤标签，只保留自定义标签
     custom_labels = filter_custom_labels(issue.get('labels', []))
@@ -537,106 +1221,154 @@ def process_single_issue(issue, data):
         'icon': info.get('avatar', ''),
         'description': info.get('description', ''),
         'feed': info['feed'],
+        'etag': feed_etag,
+        'last_modified': feed_last_modified,
         'posts': posts,
         'issue_number': issue_number,
+        'issue_updated_at': issue.get('updated_at', ''),
+        'checked_ts': time.time(),
         'labels': custom_labels,  # 使用过滤后的自定义标签
-        'last_checked': format_beijing_time(),
+        'last_checked': run_timestamp(),
         'online': website_online
     }
 
+    # 写入（加锁保护并发修改），新增时同步维护索引
+    global DATA_DIRTY
+    with DATA_LOCK:
+        DATA_DIRTY = True
+        existing_index = index.get(issue_number)
+        if existing_index is not None:
+            data['content'][existing_index] = friend_data
+        else:
+            index[issue_number] = len(data['content'])
+            data['content'].append(friend_data)
+
     # 添加或更新
     if existing_index is not None:
-        data['content'][existing_index] = friend_data
-        print(f"\n✓ 更新友链: {info['title']}")
-        update_comment_on_issue(
-            issue_number,
-            f"✅ 友链已更新\n\n- 网站名称: {info['title']}\n- 网站状态: {'在线' if website_online else '访问受限'}\n- 最新文章数: {len(posts)}\n- 自定义标签: {[label['name'] for label in custom_labels]}\n\n更新时间: {format_beijing_time()}"
+        logger.info(f"\n✓ 更新友链: {info['title']}")
+        # 评论 + 状态标签 + 已通过合并为一次请求，不删除原有标签
+        notify_issue(
+            issue,
+            _COMMENT_UPDATED % (info['title'], status_label, len(posts), [label['name'] for label in custom_labels], run_timestamp()),
+            [status_label, '已通过']
         )
-        # 添加状态标签 + 已通过，不删除原有标签
-        add_labels_to_issue(issue_number, [status_label, '已通过'])
     else:
-        data['content'].append(friend_data)
-        print(f"\n✓ 新增友链: {info['title']}")
-        update_comment_on_issue(
-            issue_number,
-            f"✅ 友链申请已通过\n\n欢迎加入友链！\n\n- 网站名称: {info['title']}\n- 网站状态: {'在线' if website_online else '访问受限'}\n- 最新文章数: {len(posts)}\n- 自定义标签: {[label['name'] for label in custom_labels]}\n\n审核时间: {format_beijing_time()}"
+        logger.info(f"\n✓ 新增友链: {info['title']}")
+        # 新申请：评论 + 状态标签 + 已通过合并为一次请求，不删除原有标签
+        notify_issue(
+            issue,
+            _COMMENT_APPROVED % (info['title'], status_label, len(posts), [label['name'] for label in custom_labels], run_timestamp()),
+            [status_label, '已通过']
         )
-        # 新申请：添加状态标签 + 已通过，不删除原有标签
-        add_labels_to_issue(issue_number, [status_label, '已通过'])
 
-    print(f"{'='*60}\n")
+    logger.info(f"{'='*60}\n")
     return True
 
+async def process_single_issue_async(issue, data, index, semaphore):
+    """在线程池中运行单个 Issue 的阻塞处理流程"""
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            ISSUE_EXECUTOR, process_single_issue, issue, data, index)
+        sys.stdout.flush()  # 每个 Issue 处理完集中刷一次输出
+        return result
+
+async def process_issues_concurrently(issues, data, index):
+    """并发处理所有 Issue，用信号量限制并发数
+
+    网络 I/O（网站检查、RSS 抓取、GitHub API）占绝大部分耗时，
+    并发后总耗时从 O(N × 单个耗时) 降到接近单个 Issue 的耗时。
+    返回 (成功数, 失败数)。
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ISSUES)
+    tasks = [process_single_issue_async(issue, data, index, semaphore) for issue in issues]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    success_count = 0
+    fail_count = 0
+    for issue, result in zip(issues, results):
+        if isinstance(result, Exception):
+            fail_count += 1
+            logger.info(f"❌ 处理 Issue #{issue['number']} 时出错: {str(result)}")
+            traceback.print_exception(type(result), result, result.__traceback__)
+        elif result:
+            success_count += 1
+        else:
+            fail_count += 1
+
+    return success_count, fail_count
+
 def main():
-    print("\n" + "="*60)
-    print("友链处理系统启动")
-    print("="*60)
-    print(f"事件类型: {EVENT_NAME}")
-    print(f"仓库: {REPO}")
-    print(f"输出路径: {OUTPUT_PATH}")
-    print(f"数据文件: {DATA_FILE}")
-    print("="*60 + "\n")
+    # CI 的 stdout 默认按行刷新，每条 print 都是一次同步 write；
+    # 改为块缓冲，按 Issue 粒度集中刷新
+    try:
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    except (AttributeError, OSError):
+        pass
+
+    logger.info("\n" + "="*60)
+    logger.info("友链处理系统启动")
+    logger.info("="*60)
+    logger.info(f"事件类型: {EVENT_NAME}")
+    logger.info(f"仓库: {REPO}")
+    logger.info(f"输出路径: {OUTPUT_PATH}")
+    logger.info(f"数据文件: {DATA_FILE}")
+    logger.info("="*60 + "\n")
 
     data = load_data()
-    print(f"当前友链数量: {len(data['content'])}\n")
+    load_cache()
+    run_timestamp()  # 固定本次运行的时间戳
+    # issue_number -> 下标索引，供 process_single_issue O(1) 查找
+    issue_index = {item['issue_number']: i for i, item in enumerate(data['content'])}
+    logger.info(f"当前友链数量: {len(data['content'])}\n")
 
     if EVENT_NAME == 'issues' and ISSUE_NUMBER:
-        print(f"触发类型: Issue 事件 (#{ISSUE_NUMBER})")
+        logger.info(f"触发类型: Issue 事件 (#{ISSUE_NUMBER})")
         url = f'https://api.github.com/repos/{REPO}/issues/{ISSUE_NUMBER}'
         try:
-            response = requests.get(url, headers=HEADERS)
+            response = github_request('GET', url)
             response.raise_for_status()
             issue = response.json()
 
-            print(f"\nIssue 基本信息:")
-            print(f"  - 标题: {issue.get('title', 'N/A')}")
-            print(f"  - 状态: {issue.get('state', 'N/A')}")
-            print(f"  - 标签: {[label['name'] for label in issue.get('labels', [])]}")
+            logger.info(f"\nIssue 基本信息:")
+            logger.info(f"  - 标题: {issue.get('title', 'N/A')}")
+            logger.info(f"  - 状态: {issue.get('state', 'N/A')}")
+            logger.info(f"  - 标签: {[label['name'] for label in issue.get('labels', [])]}")
 
             labels = [label['name'] for label in issue.get('labels', [])]
             if '友链申请' in labels:
-                print(f"\n✓ 找到友链申请标签，开始处理...")
-                process_single_issue(issue, data)
+                logger.info(f"\n✓ 找到友链申请标签，开始处理...")
+                process_single_issue(issue, data, issue_index)
             else:
-                print(f"\n✗ 未找到'友链申请'标签，跳过处理")
-                print(f"  当前标签: {labels}")
+                logger.info(f"\n✗ 未找到'友链申请'标签，跳过处理")
+                logger.info(f"  当前标签: {labels}")
         except Exception as e:
-            print(f"\n❌ 获取或处理 Issue 失败: {str(e)}")
+            logger.info(f"\n❌ 获取或处理 Issue 失败: {str(e)}")
             import traceback
             traceback.print_exc()
     else:
-        print(f"触发类型: 定时任务或手动触发")
+        logger.info(f"触发类型: 定时任务或手动触发")
         issues = get_all_issues()
-        print(f"\n找到 {len(issues)} 个待处理的友链申请\n")
+        logger.info(f"\n找到 {len(issues)} 个待处理的友链申请\n")
+
+        success_count, fail_count = asyncio.run(
+            process_issues_concurrently(issues, data, issue_index)
+        )
 
-        success_count = 0
-        fail_count = 0
+        logger.info(f"\n处理统计:")
+        logger.info(f"  - 成功: {success_count}")
+        logger.info(f"  - 失败: {fail_count}")
 
-        for issue in issues:
-            try:
-                if process_single_issue(issue, data):
-                    success_count += 1
-                else:
-                    fail_count += 1
-                time.sleep(2)
-            except Exception as e:
-                fail_count += 1
-                print(f"❌ 处理 Issue #{issue['number']} 时出错: {str(e)}")
-                import traceback
-                traceback.print_exc()
-
-        print(f"\n处理统计:")
-        print(f"  - 成功: {success_count}")
-        print(f"  - 失败: {fail_count}")
-
-    print(f"\n正在保存数据到: {DATA_FILE}")
+    logger.info(f"\n正在保存数据到: {DATA_FILE}")
     save_data(data)
-    print(f"✓ 数据保存成功")
+    save_cache()
+    logger.info(f"✓ 数据保存成功")
 
-    print("\n" + "="*60)
-    print("友链处理完成")
-    print(f"最终友链数量: {len(data['content'])}")
-    print("="*60 + "\n")
+    logger.info("\n" + "="*60)
+    logger.info("友链处理完成")
+    logger.info(f"最终友链数量: {len(data['content'])}")
+    logger.info("="*60 + "\n")
+    sys.stdout.flush()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file